@@ -1,10 +1,28 @@
+from itertools import zip_longest
 from os import PathLike
-from typing import Union, List, TextIO, BinaryIO, Any, Dict, Type
+from shutil import copyfileobj
+from typing import Union, List, TextIO, BinaryIO, Any, Dict, Type, Iterator
 
 from filedatasource import CsvReader, ExcelReader, CsvWriter, ExcelWriter, Mode, ReadMode, DataWriter, DataReader
-from filedatasource.datafile import DataSourceError
+from filedatasource.csvfile import open_binary_file
+from filedatasource.datafile import DataSourceError, CHUNK_SIZE
 from filedatasource.utils import attributes2list, dict_keys2list
 
+# The reader and writer classes for each supported file extension
+_READERS = {'.csv': CsvReader, '.csv.gz': CsvReader, '.xls': ExcelReader, '.xlsx': ExcelReader}
+_WRITERS = {'.csv': CsvWriter, '.csv.gz': CsvWriter, '.xls': ExcelWriter, '.xlsx': ExcelWriter}
+
+
+def _extension(fname: str) -> str:
+    """ Get the lowercase extension of a file name, taking into account that .csv.gz is a single extension.
+
+    :param fname: The file name.
+    :return: The extension with the dot, for example, '.csv', '.csv.gz', '.xls' or '.xlsx'.
+    """
+    # Only the suffix is lowered, the longest supported extension is .csv.gz
+    suffix = fname[-7:].lower()
+    return suffix if suffix == '.csv.gz' else suffix[suffix.rfind('.'):]
+
 
 def open_reader(fname: str, mode: ReadMode = ReadMode.OBJECT) -> DataReader:
     """ Create a CsvReader or a ExcelReader with the parameters by default only from the file path and the extension
@@ -18,10 +36,9 @@ def open_reader(fname: str, mode: ReadMode = ReadMode.OBJECT) -> DataReader:
     :return: A CsvReader or a ExcelReader depending on the file extension.
     :raises ValueError: If the file name is not a CSV (compressed or not) or Excel (XLSX, XLS) file.
     """
-    if fname.lower().endswith('.csv') or fname.lower().endswith('.csv.gz'):
-        return CsvReader(fname, mode=mode)
-    if fname.lower().endswith('.xls') or fname.lower().endswith('.xlsx'):
-        return ExcelReader(fname, mode=mode)
+    reader_class = _READERS.get(_extension(fname))
+    if reader_class:
+        return reader_class(fname, mode=mode)
     raise ValueError(f'The file name {fname} has to finish in .csv, .csv.gz, .xls, or .xlsx to use this function')
 
 
@@ -35,10 +52,9 @@ def open_writer(fname: str, fieldnames: List[str]) -> DataWriter:
     :return: A CsvWriter or a ExcelWriter depending on the file extension.
     :raises ValueError: If the file name is not a CSV (compressed or not) or Excel (XLSX, XLS) file.
     """
-    if fname.lower().endswith('.csv') or fname.lower().endswith('.csv.gz'):
-        return CsvWriter(fname, fieldnames=fieldnames)
-    if fname.lower().endswith('.xls') or fname.lower().endswith('.xlsx'):
-        return ExcelWriter(fname, fieldnames=fieldnames)
+    writer_class = _WRITERS.get(_extension(fname))
+    if writer_class:
+        return writer_class(fname, fieldnames=fieldnames)
     raise ValueError(f'The file name {fname} has to finish in .csv, .csv.gz, .xls, or .xlsx to use this function')
 
 
@@ -71,7 +87,7 @@ def dict2csv(file_or_io: Union[str, TextIO, BinaryIO], data: List[Dict],
     :param mode: The writing mode: Mode.APPEND or Mode.WRITE. By default Mode.WRITE.
     :param encoding: The encoding (it is only used if the parameter file_or_io is a file path).
     """
-    fieldnames = fieldnames if fieldnames or not data else [k for k in data[0]]
+    fieldnames = fieldnames if fieldnames or not data else list(data[0])
     with CsvWriter(file_or_io, fieldnames, mode, encoding) as writer:
         writer.write_dicts(data)
 
@@ -119,7 +135,7 @@ def dict2excel(fname: str, data: List[Dict], sheet: Union[str, int] = 0,
     :param fieldnames: The list of fieldnames. It could be given as a list or a type or object with properties or
     attributes. If this parameter is not given, then use the first dictionary keys as fieldnames.
     """
-    fieldnames = fieldnames if fieldnames or not data else [k for k in data[0]]
+    fieldnames = fieldnames if fieldnames or not data else list(data[0])
     with ExcelWriter(fname, sheet, fieldnames) as writer:
         writer.write_dicts(data)
 
@@ -152,6 +168,21 @@ def csv2list(file_or_io: Union[str, TextIO, BinaryIO], encoding: str = 'utf-8',
         return reader.read_lists()
 
 
+def csv2list_iter(file_or_io: Union[str, TextIO, BinaryIO], encoding: str = 'utf-8',
+                  types: Union[List[Type], Dict[str, Type]] = None,
+                  chunk_size: int = CHUNK_SIZE) -> Iterator[List[List[Any]]]:
+    """ Read a CSV file (compressed or not) in chunks of rows, without loading the whole file in memory.
+
+    :param file_or_io: The file path or the file stream.
+    :param encoding: The file encoding.
+    :param types: The type of each field.
+    :param chunk_size: The maximum number of rows of each chunk.
+    :return: An iterator of lists of lists with the file rows. Each column value is stored as list element.
+    """
+    with CsvReader(file_or_io, ReadMode.LIST, encoding, types) as reader:
+        yield from reader.read_chunks(chunk_size)
+
+
 def csv2dict(file_or_io: Union[str, TextIO, BinaryIO], encoding: str = 'utf-8',
              types: Union[List[Type], Dict[str, Type]] = None) -> List[Dict]:
     """ Read a CSV file (compressed or not) and return a list of dictionaries with the file content..
@@ -191,6 +222,19 @@ def excel2list(filename: Union[PathLike, str, bytes], sheet: Union[str, int] = 0
         return reader.read_lists()
 
 
+def excel2list_iter(filename: Union[PathLike, str, bytes], sheet: Union[str, int] = 0,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[List[List[Any]]]:
+    """ Read a Excel file (xlsx or xls) in chunks of rows, without storing all the rows in memory at the same time.
+
+    :param filename: The file path to the Excel file.
+    :param sheet: The sheet name or the sheet number (starting by 0).
+    :param chunk_size: The maximum number of rows of each chunk.
+    :return: An iterator of lists of lists with the file rows. Each column value is stored as list element.
+    """
+    with ExcelReader(filename, sheet, ReadMode.LIST) as reader:
+        yield from reader.read_chunks(chunk_size)
+
+
 def excel2dict(filename: Union[PathLike, str, bytes], sheet: Union[str, int] = 0) -> List[Dict]:
     """ Read a Excel file (xlsx or xls) and return a list of dictionaries with the file content.
 
@@ -230,6 +274,8 @@ def load(fname: str, mode: ReadMode = ReadMode.OBJECT) -> Union[List[object], Li
         return load_dicts(fname)
     elif mode == ReadMode.LIST:
         return load_lists(fname)
+    with open_reader(fname, mode=mode) as reader:
+        return list(reader)
 
 
 def load_objs(fname: str) -> List[object]:
@@ -240,7 +286,7 @@ def load_objs(fname: str) -> List[object]:
     as column values.
     """
     with open_reader(fname) as reader:
-        return [obj for obj in reader]
+        return list(reader)
 
 
 def load_dicts(fname) -> List[Dict]:
@@ -251,7 +297,7 @@ def load_dicts(fname) -> List[Dict]:
     and with the dictionary values as column values.
     """
     with open_reader(fname, mode=ReadMode.DICT) as reader:
-        return [d for d in reader]
+        return list(reader)
 
 
 def load_lists(fname) -> List[List]:
@@ -261,7 +307,7 @@ def load_lists(fname) -> List[List]:
     :return: A list of lists. Each list is a file row with the column values.
     """
     with open_reader(fname, mode=ReadMode.LIST) as reader:
-        return [lst for lst in reader]
+        return list(reader)
 
 
 def save(fname: str, objs: List[object]) -> None:
@@ -317,15 +363,22 @@ def save_lists(fname: str, lists: List[List], fieldnames: List[str]) -> None:
 def convert(fr_file: str, to_file) -> None:
     """
     Convert a file into another.
+    If both files are CSV files (compressed or not), the content is copied without parsing it,
+    only compressing or decompressing it if it is necessary.
     :param fr_file: The file to copy.
     :param to_file: The target file.
     :raises ValueError: If both files are the same.
     """
     if fr_file == to_file:
         raise ValueError('Both file paths cannot be the same file.')
+    if _READERS.get(_extension(fr_file)) is CsvReader and _WRITERS.get(_extension(to_file)) is CsvWriter:
+        with open_binary_file(fr_file, Mode.READ) as reader, open_binary_file(to_file, Mode.WRITE) as writer:
+            copyfileobj(reader, writer, 1024 * 1024)
+        return
     with open_reader(fr_file, ReadMode.DICT) as reader:
         with open_writer(to_file, reader.fieldnames) as writer:
-            writer.import_reader(reader)
+            for chunk in reader.read_chunks(CHUNK_SIZE):
+                writer.write_dicts(chunk)
 
 
 def equals(filename1: Union[PathLike, str, bytes], filename2: Union[PathLike, str, bytes]) -> bool:
@@ -338,14 +391,12 @@ def equals(filename1: Union[PathLike, str, bytes], filename2: Union[PathLike, st
     :param filename2: The second file to compare with.
     :return:True if the content is the same, False otherwise.
     """
-    # Load the files
-    dict1, dict2 = load_dicts(filename1), load_dicts(filename2)
-    # Check if both lists of dictionaries has the same length
-    if len(dict1) != len(dict2):
-        return False
-    # Check each of the element of the dictionaries
-    for i, d in enumerate(dict1):
-        for key, value in d.items():
-            if key not in dict2[i] or d[key] != dict2[i][key]:
+    with open_reader(filename1, ReadMode.DICT) as reader1, open_reader(filename2, ReadMode.DICT) as reader2:
+        # If the columns are different, it is not necessary to compare the rows
+        if set(reader1.fieldnames) != set(reader2.fieldnames):
+            return False
+        # Compare row by row, a missing row in one of the files is filled with None
+        for row1, row2 in zip_longest(reader1, reader2):
+            if row1 != row2:
                 return False
     return True
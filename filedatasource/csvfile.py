@@ -1,20 +1,58 @@
-import gzip
+import os
 from abc import ABC, ABCMeta
-from csv import DictWriter, DictReader
-from typing import Union, TextIO, BinaryIO, List, Type, Dict
+from collections.abc import Sized
+from csv import DictReader, writer, reader
+from functools import lru_cache
+from io import BufferedReader, BufferedWriter, TextIOWrapper
+from operator import itemgetter
+from typing import Union, TextIO, BinaryIO, List, Type, Dict, Sequence, Tuple
 
 from filedatasource.datafile import DataReader, DataWriter, ReadMode, DataSourceError, Mode, DataFile
 
+# The buffer size used to read or write the CSV files
+BUFFER_SIZE = 128 * 1024
+
 
 def open_file(fname: str, mode: Mode, encoding: str = 'utf-8'):
     """ Method to open a file depending on if it is compress with gzip or not.
+    If the module isal is installed, it is used to compress and decompress the file instead of gzip.
+
     :param fname: The path to the file.
     :param mode: The open mode: Mode.APPEND, Mode.WRITE or Mode.READ.
     :param encoding: The file encoding.
     :return: A stream.
     """
-    open_func = gzip.open if fname.lower().endswith('.gz') else open
-    return open_func(fname, f'{mode.value}t', encoding=encoding, newline='')
+    if fname[-3:].lower() == '.gz':
+        buffered_class = BufferedReader if mode == Mode.READ else BufferedWriter
+        stream = buffered_class(open_binary_file(fname, mode), BUFFER_SIZE)
+        return TextIOWrapper(stream, encoding=encoding, newline='')
+    return open(fname, f'{mode.value}t', encoding=encoding, newline='', buffering=BUFFER_SIZE)
+
+
+@lru_cache(maxsize=None)
+def gzip_module():
+    """ Import the module to compress and decompress files the first time that it is needed.
+
+    :return: The module isal.igzip, which implements the same gzip format with SIMD accelerated deflate/inflate,
+      if it is installed. Otherwise, the standard gzip module.
+    """
+    try:
+        return __import__('isal.igzip', fromlist=['igzip'])
+    except ImportError:
+        return __import__('gzip')
+
+
+def open_binary_file(fname: str, mode: Mode):
+    """ Method to open a file in binary mode depending on if it is compress with gzip or not.
+    The data read from a compressed file is decompressed and the data written to a compressed file is compressed.
+
+    :param fname: The path to the file.
+    :param mode: The open mode: Mode.APPEND, Mode.WRITE or Mode.READ.
+    :return: A binary stream.
+    """
+    if fname[-3:].lower() == '.gz':
+        return gzip_module().open(fname, f'{mode.value}b')
+    return open(fname, f'{mode.value}b', buffering=BUFFER_SIZE)
 
 
 class CsvData(DataFile, ABC):
@@ -28,16 +66,17 @@ class CsvData(DataFile, ABC):
         """
         return self.__encoding
 
-    def __init__(self, file_or_io: [str, TextIO, BinaryIO], mode: Mode, encoding: str = 'utf-8'):
+    def __init__(self, file_or_io: [str, TextIO, BinaryIO], file_mode: Mode, encoding: str = 'utf-8', **kwargs):
         """ Constructor.
 
         :param file_or_io: The file path or the file stream.
-        :param mode: The open mode: Mode.APPEND, Mode.WRITE or Mode.READ.
+        :param file_mode: The open mode: Mode.APPEND, Mode.WRITE or Mode.READ.
         :param encoding: The file encoding.
+        :param kwargs: The arguments for the reader or writer constructor, for example, its mode.
         """
-        DataFile.__init__(self, file_or_io)
+        super(CsvData, self).__init__(file_or_io, **kwargs)
         self.__encoding = encoding
-        self._file = open_file(file_or_io, mode, self.encoding) if isinstance(file_or_io, str) else file_or_io
+        self._file = open_file(file_or_io, file_mode, self.encoding) if isinstance(file_or_io, str) else file_or_io
 
     def close(self) -> None:
         """ Close the file stream. """
@@ -75,13 +114,20 @@ class CsvWriter(CsvData, DataWriter):
         :raises ValueError: If mode is not Mode.WRITE or Mode.APPEND or if file_or_io is a file stream with
           write or append modes but this modes does not correspond to the mode parameter.
         """
-        CsvData.__init__(self, file_or_io, mode, encoding)
-        DataWriter.__init__(self, file_or_io, mode)
+        # If the file to append does not exist yet or it is empty, it also needs the head
+        new_file = mode == Mode.APPEND and isinstance(file_or_io, str) and \
+            (not os.path.exists(file_or_io) or not os.path.getsize(file_or_io))
+        super(CsvWriter, self).__init__(file_or_io, mode, encoding, mode=mode)
         self._fieldnames = self._parse_fieldnames(fieldnames)
 
-        self._writer = DictWriter(self._file, fieldnames=self.fieldnames)
-        if mode == Mode.WRITE:
-            self._writer.writeheader()
+        self._writer = writer(self._file)
+        self.__num_fields = len(self.fieldnames)
+        self.__fields = frozenset(self.fieldnames)
+        self.__field_order = tuple(self.fieldnames)
+        self.__get_values = itemgetter(*self.fieldnames) if self.__num_fields > 1 else \
+            lambda row: tuple(row[field] for field in self.__field_order)
+        if mode == Mode.WRITE or new_file:
+            self._writer.writerow(self.fieldnames)
             self.__num_row = 0
         else:
             self.__num_row = None
@@ -91,10 +137,78 @@ class CsvWriter(CsvData, DataWriter):
 
         :param row: The dictionary or parameters to write.
         """
-        self._writer.writerow(row)
+        self._writer.writerow(self.__dict2list(row))
+        if self.__num_row is not None:
+            self.__num_row += 1
+
+    def write_dict(self, row: dict) -> None:
+        """ Write a dictionary as a row.
+
+        :param row: A dictionary with the fieldnames as a key and the row data as the dictionary values.
+        """
+        self._writer.writerow(self.__dict2list(row))
         if self.__num_row is not None:
             self.__num_row += 1
 
+    def write_dicts(self, rows: Sequence[dict]) -> None:
+        """ Write a list of dictionaries in only one call to the CSV writer.
+
+        :param rows:  The list of dictionaries. Each dictionary has to contain as keys the fieldnames and as value
+        the row data to store. It can also be an iterator of dictionaries.
+        """
+        if self.__num_row is not None and not isinstance(rows, Sized):
+            # The iterators are converted into a list to count the written rows
+            rows = list(rows)
+        self._writer.writerows(map(self.__dict2list, rows))
+        if self.__num_row is not None:
+            self.__num_row += len(rows)
+
+    def __dict2list(self, row: dict) -> Sequence:
+        """ Convert a dictionary into the sequence of values to write, in the same order than the fieldnames.
+
+        :param row: The dictionary with the row data.
+        :return: The sequence of values. The missing fields are written as empty strings.
+        :raises ValueError: If the dictionary contains keys that are not fieldnames.
+        """
+        if row.keys() == self.__fields:
+            return self.__get_values(row)
+        wrong_fields = row.keys() - self.__fields
+        if wrong_fields:
+            raise ValueError('dict contains fields not in fieldnames: ' + ', '.join([repr(x) for x in wrong_fields]))
+        return [row.get(field, '') for field in self.__field_order]
+
+    def write_list(self, lst: list) -> None:
+        """ Write a list of values directly, without converting it into a dictionary.
+
+        :param lst: The list of values. It is going to store in the same order than the fieldnames.
+        """
+        self._writer.writerow(self.__fit_list(lst))
+        if self.__num_row is not None:
+            self.__num_row += 1
+
+    def write_lists(self, lists: Sequence[list]) -> None:
+        """ Write a sequences of lists as a sequence of rows in only one call to the CSV writer.
+
+        :param lists: The sequence of rows as lists. It can also be an iterator of lists.
+        """
+        if self.__num_row is not None and not isinstance(lists, Sized):
+            # The iterators are converted into a list to count the written rows
+            lists = list(lists)
+        self._writer.writerows(map(self.__fit_list, lists))
+        if self.__num_row is not None:
+            self.__num_row += len(lists)
+
+    def __fit_list(self, lst: list) -> list:
+        """ Adjust a list of values to the number of fieldnames, like it is done when the row is written as a dict.
+
+        :param lst: The list of values.
+        :return: The same list if it has the same length than the fieldnames. Otherwise, a new list cutting the extra
+          values or filling the missing ones with empty strings.
+        """
+        if len(lst) == self.__num_fields:
+            return lst
+        return list(lst[:self.__num_fields]) + [''] * (self.__num_fields - len(lst))
+
     def __len__(self) -> int:
         """
         Calculate the number of rows in the file.
@@ -139,7 +253,7 @@ class CsvReader(CsvData, DataReader):
         """
         :return: The sequence of field names to use as CSV head.
         """
-        return list(self._reader.fieldnames)
+        return list(self._reader.fieldnames or [])
 
     def __init__(self, file_or_io: Union[str, TextIO, BinaryIO], mode: ReadMode = ReadMode.OBJECT,
                  encoding: str = 'utf-8', types: Union[List[Type], Dict[str, Type]] = None):
@@ -152,17 +266,18 @@ class CsvReader(CsvData, DataReader):
           it will return objects, dictionaries or lists depending on if the value of this parameter is ReadMode.OBJECT,
           ReadMode.DICTIONARY or ReadMode.LIST, respectively.
         :param types: The type of each field.
-        :raises ValueError: If the read mode is not ReadMode.OBJECT, ReadMode.DICT or ReadMode.LIST.
+        :raises ValueError: If the read mode is not ReadMode.OBJECT, ReadMode.DICT, ReadMode.LIST or ReadMode.TUPLE.
         """
-        if mode not in [ReadMode.OBJECT, ReadMode.DICT, ReadMode.LIST]:
-            raise ValueError(f'The read mode only can be ReadMode.OBJECT, ReadMode.DICT or ReadMode.LIST, not {mode}.')
-        super(CsvReader, self).__init__(file_or_io, Mode.READ, encoding)
-        DataReader.__init__(self, file_or_io, mode)
+        if mode not in [ReadMode.OBJECT, ReadMode.DICT, ReadMode.LIST, ReadMode.TUPLE]:
+            raise ValueError(f'The read mode only can be ReadMode.OBJECT, ReadMode.DICT, ReadMode.LIST or '
+                             f'ReadMode.TUPLE, not {mode}.')
+        super(CsvReader, self).__init__(file_or_io, Mode.READ, encoding, mode=mode)
         self._reader = DictReader(self._file)
         self.__length = None
         if types and not isinstance(types, List) and not isinstance(types, Dict):
             raise ValueError('If the parameter types is defined, it must be a list o dict.')
         self.__types = types if types else []
+        self.__field_types = None
 
     def read_row(self) -> dict:
         """ Read a row of the CSV file.
@@ -173,10 +288,20 @@ class CsvReader(CsvData, DataReader):
         d = next(self._reader)
         if not self.__types:
             return d
-        if isinstance(self.__types, List):
-            return {k: (self.__types[i](v) if i < len(self.__types) else v) for i, (k, v) in enumerate(d.items())}
+        if self.__field_types is None:
+            self.__field_types = self.__parse_types()
+        for field, field_type in self.__field_types:
+            d[field] = field_type(d[field])
+        return d
 
-        return {k: (self.__types[k](v) if k in self.__types else v) for k, v in d.items()}
+    def __parse_types(self) -> List[Tuple[str, Type]]:
+        """ Assign the types to their fieldnames. This is only done once, when the first row is read.
+
+        :return: A list of pairs with the fieldname and its type, only for the fields that have a defined type.
+        """
+        if isinstance(self.__types, List):
+            return list(zip(self._reader.fieldnames, self.__types))
+        return [(field, self.__types[field]) for field in self._reader.fieldnames if field in self.__types]
 
     def __len__(self) -> int:
         """ Calculate the number of rows. The first time you call this method it read the whole file once and
@@ -186,12 +311,14 @@ class CsvReader(CsvData, DataReader):
         :raises DataFileError: If with this data source is not possible to calculate the number of rows.
           It is not possible to calculate if this comes from a file stream.
         """
-        if self.__length:
+        if self.__length is not None:
             return self.__length
         if self.file_name:
-            with CsvReader(self.file_name, ReadMode.DICT, self.encoding) as reader:
-                self.__length = sum(1 for _ in reader)
-                return self.__length
-        # return self.__length
+            # Count the rows without creating a dictionary for each one, skipping the head and the empty lines
+            with open_file(self.file_name, Mode.READ, self.encoding) as file:
+                rows = reader(file)
+                next(rows, None)
+                self.__length = sum(1 for row in rows if row)
+            return self.__length
         raise DataSourceError(f'The length of the data source cannot be computed if it is defined as a file stream '
                               f'instead of a file path.')
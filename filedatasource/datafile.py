@@ -1,6 +1,7 @@
 from abc import ABC, ABCMeta, abstractmethod
 from enum import Enum, unique, auto
-from typing import List, Union, TextIO, BinaryIO, Any, Dict, Sequence, Callable
+from itertools import islice
+from typing import List, Union, TextIO, BinaryIO, Any, Dict, Sequence, Callable, Iterator, Tuple
 
 from filedatasource.utils import dict2obj, attributes2list, attributes2dict, dict2list, dict_keys2list
 
@@ -19,6 +20,17 @@ class ReadMode(Enum):
     OBJECT = auto()  # Return each row as object with attributes
     DICT = auto()  # Return each row as dictionary
     LIST = auto()  # Return each row as list of values
+    TUPLE = auto()  # Return each row as tuple of values, without any conversion if the file is read by rows of values
+
+
+# The sentinel to iterate the reader methods until they raise StopIteration, it is never returned as a row
+_NO_ROW = object()
+# The default number of rows that are read or written at once when the files are processed in chunks
+CHUNK_SIZE = 10000
+
+
+# The functions to convert the fieldnames into a list depending on their type
+_FIELDNAMES_PARSERS = {list: lambda fieldnames: fieldnames, tuple: list, dict: dict_keys2list}
 
 
 class DataSourceError(Exception):
@@ -68,8 +80,8 @@ class DataWriter(DataFile, ABC):
     def mode(self) -> Mode:
         return self.__mode
 
-    def __init__(self, file_or_io: Union[str, TextIO, BinaryIO], mode: Mode):
-        super(DataWriter, self).__init__(file_or_io)
+    def __init__(self, file_or_io: Union[str, TextIO, BinaryIO], mode: Mode, **kwargs):
+        super(DataWriter, self).__init__(file_or_io, **kwargs)
         self.__check_mode(mode)
         self.__mode = mode
 
@@ -83,21 +95,23 @@ class DataWriter(DataFile, ABC):
             raise ValueError(f'The reader is in mode {mode} but the file stream is in not in append mode ("{f_mode}").')
 
     @staticmethod
-    def _parse_fieldnames(fieldnames: Union[List[str], Dict, object]) -> List[str]:
-        """ Convert the fieldnames if their are defined as a dict or an object with attributes or properties in
-        a list of fieldnames without values.
+    def _parse_fieldnames(fieldnames: Union[List[str], Tuple[str, ...], Dict, object]) -> List[str]:
+        """ Convert the fieldnames if their are defined as a tuple, a dict or an object with attributes or properties
+        in a list of fieldnames without values.
         If this argument is already a list, then return it without any modification.
 
-        :param fieldnames: A list, dictionary or object.
+        :param fieldnames: A list, tuple, dictionary or object.
         :return: A list of strings that represent the fieldnames.
         """
-        if isinstance(fieldnames, List):
-            return fieldnames
+        parse = _FIELDNAMES_PARSERS.get(type(fieldnames))
+        if parse:
+            return parse(fieldnames)
+        # Subclasses of the dispatched types
+        if isinstance(fieldnames, (list, tuple)):
+            return list(fieldnames)
         if isinstance(fieldnames, dict):
             return dict_keys2list(fieldnames)
-        if isinstance(fieldnames, object):
-            return attributes2list(fieldnames)
-        return []
+        return attributes2list(fieldnames)
 
     def write(self, o: Union[List, dict, object]) -> None:
         """ Write a row.
@@ -140,7 +154,7 @@ class DataWriter(DataFile, ABC):
 
         :param o: The objects to write with public attributes or properties.
         """
-        self.write_row(**attributes2dict(o))
+        self.write_dict(attributes2dict(o))
 
     def write_objects(self, objects: Sequence[object]) -> None:
         """ Write a sequence of objects.
@@ -155,7 +169,16 @@ class DataWriter(DataFile, ABC):
 
         :param lst: The list of values. It is going to store in the same order than the fieldnames.
         """
-        self.write_dict({field: lst[i] for i, field in enumerate(self.fieldnames) if i < len(lst)})
+        self._write_values(lst)
+
+    def _write_values(self, values: Sequence) -> None:
+        """ Write a row from its values in the same order than the fieldnames. The extra values are ignored.
+        By default, the values are converted into a dictionary, but the writers that can write the values by position
+        should override this method to avoid that conversion.
+
+        :param values: The row values.
+        """
+        self.write_dict(dict(zip(self.fieldnames, values)))
 
     def write_lists(self, lists: Sequence[list]) -> None:
         """ Write a sequences of lists as a sequence of rows
@@ -170,23 +193,37 @@ class DataWriter(DataFile, ABC):
 
         :param reader: The reader to import.
         """
-        for obj in reader:
-            self.write(obj)
+        if reader.fieldnames != self.fieldnames:
+            for obj in reader:
+                self.write(obj)
+            return
+        # The fields are in the same order, so the row values are written by position in chunks of rows
+        rows = iter(reader.read_row_values, _NO_ROW)
+        chunk = list(islice(rows, CHUNK_SIZE))
+        while chunk:
+            self.write_lists(chunk)
+            chunk = list(islice(rows, CHUNK_SIZE))
 
 
 class DataReader(DataFile, ABC):
     """ A data reader to read very easy a file with data, usually, the typical CSV or Excel files. """
     __metaclass__ = ABCMeta
 
-    def __init__(self, file_or_io: Union[str, TextIO, BinaryIO], mode: ReadMode = ReadMode.OBJECT) -> None:
+    @property
+    def mode(self) -> ReadMode:
+        """ :return: The default mode to read the rows. """
+        return self.__mode
+
+    def __init__(self, file_or_io: Union[str, TextIO, BinaryIO], mode: ReadMode = ReadMode.OBJECT, **kwargs) -> None:
         """ Constructor.
 
         :param file_or_io: The file or the IO stream to read.
         :param mode: The default mode to read the rows. When the reader is iterated,
         it will return objects, dictionaries or lists depending on if the value of this parameter is ReadMode.OBJECT,
         ReadMode.DICTIONARY or ReadMode.LIST, respectively.
+        :param kwargs: The arguments for the next constructors in the method resolution order of the final class.
         """
-        super(DataReader, self).__init__(file_or_io)
+        super(DataReader, self).__init__(file_or_io, **kwargs)
         if mode not in [elem for elem in ReadMode]:
             ValueError(f'The mode argument must be ReadMode.OBJECT, ReadMode.DICT or ReadMode.LIST instead of {mode}.')
         self.__mode = mode
@@ -207,6 +244,8 @@ class DataReader(DataFile, ABC):
             return self.read_row()
         elif self.__mode == ReadMode.OBJECT:
             return self.read_object()
+        elif self.__mode == ReadMode.TUPLE:
+            return self.read_row_values()
         return self.read_list()
 
     @abstractmethod
@@ -224,6 +263,14 @@ class DataReader(DataFile, ABC):
         """
         return self.__read_lists(self.read_row)
 
+    def read_row_values(self) -> tuple:
+        """ Read a row of the file as a tuple of values. The readers that read the rows as sequences of values
+        should override this method to avoid creating a dictionary for each row.
+
+        :return: A tuple with the row values in the same order than the fieldnames.
+        """
+        return tuple(self.read_row().values())
+
     def read_list(self) -> list:
         """ Read a row of the CSV file as a list.
 
@@ -255,6 +302,28 @@ class DataReader(DataFile, ABC):
         """
         return self.__read_lists(self.read_object)
 
+    def read_batch(self, size: int) -> List[Any]:
+        """ Read the next rows of the file at once. Each row is returned as an object, a dictionary or a list depending
+        on the reader mode.
+
+        :param size: The maximum number of rows to read.
+        :return: A list with the read rows. It could have less rows than size if the end of the file is reached, or
+        be empty if there are not more rows.
+        """
+        return list(islice(self, size))
+
+    def read_chunks(self, size: int = CHUNK_SIZE) -> Iterator[List[Any]]:
+        """ Read the file in chunks of rows, therefore, only a chunk of rows is stored in memory at the same time.
+        Each row is returned as an object, a dictionary or a list depending on the reader mode.
+
+        :param size: The maximum number of rows of each chunk.
+        :return: An iterator of lists with the rows of each chunk. The last chunk could have less rows.
+        """
+        chunk = self.read_batch(size)
+        while chunk:
+            yield chunk
+            chunk = self.read_batch(size)
+
     @staticmethod
     def __read_lists(func: Callable) -> List[Any]:
         """ Call the function until it returns a StopIteration exception. Then, this method returns a list with
@@ -263,10 +332,4 @@ class DataReader(DataFile, ABC):
         :param func: The function to call.
         :return: A list of results.
         """
-        lst = []
-        try:
-            while True:
-                result = func()
-                lst.append(result)
-        except StopIteration:
-            return lst
+        return list(iter(func, _NO_ROW))
@@ -1,44 +1,103 @@
-from abc import ABC, ABCMeta
-from typing import Union, List, Tuple
+import os
+from abc import ABC, ABCMeta, abstractmethod
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from tempfile import mkstemp
+from typing import Union, List, Tuple, Iterator, Callable, Any, Sequence
 
 from filedatasource import Mode
 from filedatasource.datafile import DataReader, DataFile, DataWriter, ReadMode
+from filedatasource.utils import row_class, dict2obj
 
 
-def open_excel(fname: str):
-    if fname.lower().endswith('.xlsx'):
-        return open_xlsx(fname)
-    elif fname.lower().endswith('.xls'):
-        return open_xls(fname)
+def _excel_format(fname: str) -> str:
+    """ Get the Excel format of a file from its extension.
+
+    :param fname: The path to the Excel file.
+    :return: The file extension in lower case and without the dot, for example, 'xlsx' or 'xls'.
+    """
+    _, dot, ext = fname.rpartition('.')
+    return ext.lower() if dot else ''
+
+
+@lru_cache(maxsize=None)
+def _import_module(module: str, package: str):
+    """ Import an optional module the first time that it is needed. The next calls return the already imported module.
+
+    :param module: The module name.
+    :param package: The name of the package to install if the module is not installed.
+    :return: The imported module.
+    :raises ModuleNotFoundError: If the module is not installed.
+    """
+    try:
+        return __import__(module)
+    except ImportError:
+        raise ModuleNotFoundError(f'{package} is required. Please, install it with:\n\npip install {package}')
+
+
+def open_excel(fname: str, read_only: bool = False):
+    ext = _excel_format(fname)
+    if ext == 'xlsx':
+        return open_xlsx(fname, read_only=read_only)
+    elif ext == 'xls':
+        return open_xls(fname, on_demand=read_only)
     raise ValueError(f'The file name {fname} has to finish in .xls, or .xlsx to use this method.')
 
 
-def open_xls(fname: str):
+def open_xls(fname: str, on_demand: bool = False):
     """  Open an Excel file in the old xls format importing the module.
 
     :param fname: The path to the xls file.
+    :param on_demand: If True, the sheets are only loaded when they are requested. In this mode, the workbook
+      resources have to be released after using it.
     :return: The workbook which is a instance of xlrd.book.Book class.
     :raises ModuleNotFoundError: If the module xlrd is not installed.
     """
-    try:
-        xlrd = __import__('xlrd')
-    except ImportError:
-        raise ModuleNotFoundError('xlrd is required. Please, install it with:\n\npip install xlrd')
-    return xlrd.open_workbook(fname)
+    xlrd = _import_module('xlrd', 'xlrd')
+    return xlrd.open_workbook(fname, on_demand=on_demand)
 
 
-def open_xlsx(fname: str):
+def open_xlsx(fname: str, read_only: bool = False):
     """  Open an Excel file in xlsx format importing the module.
 
     :param fname: The path to the xlsx file.
+    :param read_only: If True, the workbook is opened in read-only mode, the sheet rows are parsed while they are
+      iterated instead of loading the whole workbook in memory, and the formulas are returned with their last
+      calculated value. In this mode, the workbook has to be closed after using it.
     :return: The workbook which is a instance of Workbook class.
     :raises ModuleNotFoundError: If the module openpyxl is not installed.
     """
+    openpyxl = _import_module('openpyxl', 'openpyxl')
+    if read_only:
+        return openpyxl.load_workbook(fname, read_only=True, data_only=True, keep_links=False)
+    return openpyxl.load_workbook(fname)
+
+
+@lru_cache(maxsize=None)
+def calamine_module():
+    """ Import the module python-calamine the first time that it is needed, if it is installed.
+
+    :return: The module python_calamine, which parses the Excel files in native code, or None if it is not installed.
+    """
     try:
-        openpyxl = __import__('openpyxl')
+        return __import__('python_calamine')
     except ImportError:
-        raise ModuleNotFoundError('openpyxl is required. Please, install it with:\n\npip install openpyxl')
-    return openpyxl.load_workbook(fname)
+        return None
+
+
+def open_calamine(fname: str):
+    """  Open an Excel file with python-calamine.
+
+    :param fname: The path to the Excel file.
+    :return: The workbook which is a instance of python_calamine.CalamineWorkbook class.
+    :raises ModuleNotFoundError: If the module python-calamine is not installed.
+    """
+    calamine = calamine_module()
+    if calamine is None:
+        raise ModuleNotFoundError('python-calamine is required. Please, install it with:\n\n'
+                                  'pip install python-calamine')
+    return calamine.CalamineWorkbook.from_path(fname)
 
 
 def sheets(fname: str) -> List[str]:
@@ -47,36 +106,48 @@ def sheets(fname: str) -> List[str]:
     :param fname: The path to the Excel file.
     :return: A list the seet names of that Excel file.
     """
-    doc = open_excel(fname)
-    if fname.lower().endswith('.xls'):
-        return doc.sheet_names()
-    if fname.lower().endswith('.xlsx'):
-        return doc.sheetnames
-
-
-def create_excel(fname: str, sheet: Union[str, int]) -> Tuple['Workbook', 'Worksheet', str]:
-    if not fname.lower().endswith('.xlsx') and not fname.lower().endswith('.xls'):
-        raise ValueError('The file name has to be the xlsx or xls extensions.')
-    if fname.lower().endswith('.xlsx'):
-        doc = create_xlsx(fname)
-        return doc, doc.add_worksheet(sheet if sheet else 'Sheet'), 'xlsx'
+    doc = open_excel(fname, read_only=True)
+    if _excel_format(fname) == 'xls':
+        names = doc.sheet_names()
+        doc.release_resources()
     else:
+        names = doc.sheetnames
+        doc.close()
+    return names
+
+
+def create_excel(fname: str, sheet: Union[str, int],
+                 constant_memory: bool = False) -> Tuple['Workbook', 'Worksheet', str]:
+    """ Create an Excel file in xlsx or xls format depending on the file extension.
+
+    :param fname: The path to save the Excel file.
+    :param sheet: The name of the sheet to create.
+    :param constant_memory: If True, the xlsx files are created in constant memory mode. See create_xlsx().
+    :return: A tuple with the workbook, the sheet and the file extension.
+    :raises ValueError: If the file name does not end in .xls or .xlsx.
+    """
+    ext = _excel_format(fname)
+    if ext == 'xlsx':
+        doc = create_xlsx(fname, constant_memory=constant_memory)
+        return doc, doc.add_worksheet(sheet if sheet else 'Sheet'), ext
+    if ext == 'xls':
         doc = create_xls()
-        return doc, doc.add_sheet(sheet if sheet else 'Sheet'), 'xls'
+        return doc, doc.add_sheet(sheet if sheet else 'Sheet'), ext
+    raise ValueError('The file name has to be the xlsx or xls extensions.')
 
 
-def create_xlsx(fname: str) -> 'Workbook':
+def create_xlsx(fname: str, constant_memory: bool = False) -> 'Workbook':
     """  Create an Excel file in the xlsx format importing the module.
 
     :param fname: The path to save the xlsx file.
+    :param constant_memory: If True, each row is flushed to a temporal file when the next one is started, instead of
+      keeping all the cells in memory until the workbook is closed. In this mode, the rows have to be written in order,
+      because the cells written in the previous rows are ignored.
     :return: The workbook which is a instance of Workbook class.
     :raises ModuleNotFoundError: If the module xlsxwriter is not installed.
     """
-    try:
-        xlsxwriter = __import__('xlsxwriter')
-    except ImportError:
-        raise ModuleNotFoundError('xlsxwriter is required. Please, install it with:\n\npip install xlsxwriter')
-    return xlsxwriter.Workbook(fname)
+    xlsxwriter = _import_module('xlsxwriter', 'xlsxwriter')
+    return xlsxwriter.Workbook(fname, {'constant_memory': constant_memory})
 
 
 def create_xls() -> 'Workbook':
@@ -85,13 +156,40 @@ def create_xls() -> 'Workbook':
     :return: The workbook which is a instance of xlrd.book.Book class.
     :raises ModuleNotFoundError: If the module xlwt is not installed.
     """
-    try:
-        xlwt = __import__('xlwt')
-    except ImportError:
-        raise ModuleNotFoundError('xlwt is required. Please, install it with:\n\npip install xlwt')
+    xlwt = _import_module('xlwt', 'xlwt')
     return xlwt.Workbook()
 
 
+def _file_mode(fname: str) -> int:
+    """ Get the permissions to save a file.
+
+    :param fname: The file path.
+    :return: The permissions of the file if it already exists. Otherwise, the default permissions of the new files.
+    """
+    if os.path.exists(fname):
+        return os.stat(fname).st_mode & 0o7777
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+@lru_cache(maxsize=None)
+def _format_class(cls: type, format_class: type) -> type:
+    """ Create the class of a reader or writer subclass for a file format, inheriting from both classes.
+
+    :param cls: A subclass of ExcelReader or ExcelWriter defined outside this module.
+    :param format_class: The reader or writer class for the file format.
+    :return: A class with the same name than cls whose methods are taken from cls first and then from format_class.
+    """
+    return type(cls.__name__, (cls, format_class), {'__module__': cls.__module__, '__qualname__': cls.__qualname__})
+
+
+# The value returned when a fieldname is not in a row dictionary, it is never written
+_MISSING = object()
+# The xlrd cell type of the numbers (xlrd.XL_CELL_NUMBER), defined here to avoid importing xlrd when it is not used
+_XL_CELL_NUMBER = 2
+
+
 class ExcelData(DataFile, ABC):
     """ Abstract class to define the common attributes of the Excel files. """
     __metaclass__ = ABCMeta
@@ -101,7 +199,7 @@ class ExcelData(DataFile, ABC):
         """
         :return: The list of fieldnames.
         """
-        return self._fieldnames
+        return list(self._fieldnames)
 
     @property
     def sheet_name(self) -> str:
@@ -117,102 +215,300 @@ class ExcelData(DataFile, ABC):
         """
         return self._sheet
 
-    def __init__(self, fname: str, sheet: Union[str, int] = None) -> None:
+    def __init__(self, fname: str, sheet: Union[str, int] = None, **kwargs) -> None:
         """ Constructor.
         :param fname: The file path to the Excel file.
         :param sheet: The sheet to read/write.
+        :param kwargs: The arguments for the reader or writer constructor, for example, its mode.
         """
-        DataFile.__init__(self, fname)
+        super(ExcelData, self).__init__(fname, **kwargs)
         self.__sheet_name = sheet if sheet else 0
         self._sheet = None
         self._fieldnames = []
 
 
 class ExcelReader(ExcelData, DataReader):
-    """ The class to read an Excel file easily. """
-    def __init__(self, fname: str, sheet: Union[str, int] = 0, mode: ReadMode = ReadMode.OBJECT) -> None:
+    """ The class to read an Excel file easily. When it is created, it returns the reader for the file format. """
+    def __new__(cls, fname: str, sheet: Union[str, int] = 0, mode: ReadMode = ReadMode.OBJECT,
+                calamine: bool = False) -> 'ExcelReader':
+        """ Select the reader class depending on the file extension and the calamine parameter.
+
+        :param fname: The file path to the Excel file.
+        :param sheet: The sheet to read.
+        :param mode: The default mode to read the rows.
+        :param calamine: If True, the file is read with python-calamine. Otherwise, the xls files are read with xlrd and
+          the xlsx files with openpyxl.
+        :return: A reader for xls files if fname ends in .xls, or for xlsx files if ends in .xlsx. If cls is a subclass
+          of ExcelReader, the reader is also an instance of that subclass.
+        :raises ValueError: If the file name does not end in .xls or .xlsx.
+        """
+        if not issubclass(cls, _RowValuesReader):
+            ext = _excel_format(fname)
+            if ext not in ('xls', 'xlsx'):
+                raise ValueError(f'The file name {fname} has to end in .xls or .xlsx.')
+            format_class = _CalamineReader if calamine else _XlsxReader if ext == 'xlsx' else _XlsReader
+            cls = format_class if cls is ExcelReader else _format_class(cls, format_class)
+        return super(ExcelReader, cls).__new__(cls)
+
+    def __init__(self, fname: str, sheet: Union[str, int] = 0, mode: ReadMode = ReadMode.OBJECT,
+                 calamine: bool = False) -> None:
         """ Constructor.
         :param fname: The file path to the Excel file.
         :param sheet: The sheet to read/write.
         :param mode: The default mode to read the rows. When the reader is iterated,
            it will return objects, dictionaries or lists depending on if the value of this parameter is ReadMode.OBJECT,
            ReadMode.DICTIONARY or ReadMode.LIST, respectively.
+        :param calamine: If True, the file is read with python-calamine, which is several times faster but it loads
+          the whole sheet in memory. Take into account that python-calamine returns the values with different types
+          than the other readers: with xls files, the booleans as bool and the dates as date or datetime, and with xlsx
+          files, the numbers as float and the empty cells as empty strings. By default, the xls files are read with
+          xlrd and the xlsx files with openpyxl.
         :raises ValueError: If the file name is not a CSV (compressed or not) or Excel (XLSX, XLS) file.
+        :raises ModuleNotFoundError: If calamine is True but python-calamine is not installed.
         """
-        super(ExcelReader, self).__init__(fname, sheet=sheet)
-        DataReader.__init__(self, fname, mode=mode)
-        if fname.lower().endswith('.xlsx'):
-            self.__doc = open_xlsx(fname)
-            self._sheet = self.__doc[sheet] if isinstance(sheet, str) else self.__doc[self.__doc.sheetnames[sheet]]
-            self._fieldnames = self.remove_empty_cells([cell.value for cell in next(self.sheet.rows)])
-            self.__iter_rows = self.sheet.iter_rows(values_only=True,
-                                                    max_col=len(self.fieldnames),
-                                                    max_row=self.sheet.max_row)
-            next(self.__iter_rows)
-            self.__type = 'xlsx'
-        elif fname.lower().endswith('.xls'):
-            doc = open_xls(fname)
-            self.__doc = doc
-            self._sheet = doc.sheet_by_name(sheet) if isinstance(sheet, str) else doc.sheet_by_index(sheet)
-            self._fieldnames = [cell.value for cell in self.sheet.row(0)]
-            self.__type = 'xls'
-        else:
-            raise ValueError(f'The file name {fname} has to end in .xls or .xlsx.')
+        super(ExcelReader, self).__init__(fname, sheet=sheet, mode=mode)
+        self._open(fname, sheet)
+        self._n_fields = len(self._fieldnames)
+
+    @abstractmethod
+    def _open(self, fname: str, sheet: Union[str, int]) -> None:
+        """ Open the workbook, select the sheet and read its fieldnames.
 
-        self.__row = 1
+        :param fname: The file path to the Excel file.
+        :param sheet: The sheet to read.
+        """
+        pass
 
     def remove_empty_cells(self, cells: List[str]) -> List[str]:
-        for i in range(len(cells) - 1, -1, -1):
-            if cells[i] is not None:
-                return cells
-            del self._fieldnames[i]
-        return cells
+        """ Remove the empty cells at the end of a row.
+
+        :param cells: The row cell values.
+        :return: The cell values until the last one that is not empty.
+        """
+        last = len(cells) - 1
+        while last >= 0 and cells[last] is None:
+            last -= 1
+        return cells[:last + 1]
+
+
+class _RowValuesReader(ExcelReader, ABC):
+    """ Abstract reader for the Excel modules that return each row as a sequence of values. """
+    __metaclass__ = ABCMeta
+
+    def _set_rows(self, rows: Iterator[Sequence]) -> None:
+        """ Set the iterator of the row values, after the head has been read.
+
+        :param rows: The iterator of the row values, each one with the same length than the fieldnames.
+        """
+        self.__iter_rows = rows
+        self.__next_row = rows.__next__
+        self.__row_class = None
 
     def read_row(self) -> dict:
         """ Read a row of the Excel file as a dict.
 
         :return: A dictionary where the keys are the fieldnames, and their values the row values.
         """
-        sheet = self.sheet
-        if self.__row < (sheet.max_row if self.__type == 'xlsx' else sheet.nrows):
-            self.__row += 1
-            if self.__type == 'xlsx':
-                return self.__read_xlsx_row(sheet)
-            else:
-                return self.__read_xls_row(sheet)
-        raise StopIteration()
+        # The row iterator raises StopIteration at the end of the sheet
+        return dict(zip(self._fieldnames, self.__next_row()))
+
+    def read_row_values(self) -> tuple:
+        """ Read a row of the Excel file as a tuple of values.
+
+        :return: A tuple with the row values in the same order than the fieldnames.
+        """
+        return tuple(self.__next_row())
+
+    def read_list(self) -> list:
+        """ Read a row of the Excel file as a list.
+
+        :return: A list of values with the data of each column of the file row.
+        """
+        return list(self.__next_row())
+
+    def read_rows(self) -> List[dict]:
+        """ Read the whole file and return a list of dictionaries with each one of the file rows.
+
+        :return: A list of dictionaries that represents the list of file rows.
+        """
+        return list(map(self.__row_factory(ReadMode.DICT), self.__iter_rows))
+
+    def read_lists(self) -> List[list]:
+        """ Read the whole file and return a list of lists with each one of the file rows, directly from the row
+        values, without creating a dictionary for each row.
+
+        :return: A list of lists that represents the list of file rows.
+        """
+        return list(map(list, self.__iter_rows))
+
+    def read_object(self) -> object:
+        """ Read a row of the Excel file as a Python object.
+
+        :return: An object with the fieldnames as object attributes and of each column value as their values.
+        See DataReader.read_object() for further information.
+        """
+        if not self.__get_row_class():
+            return super(_RowValuesReader, self).read_object()
+        return self.__row_class._make(self.__next_row())
+
+    def __get_row_class(self) -> Union[type, None]:
+        """ Get the class to create the row objects directly from the row values.
+
+        :return: The namedtuple class for the fieldnames, or None if there are repeated fieldnames, because in that
+          case the row objects have to be created from the row dictionary.
+        """
+        if self.__row_class is None and len(set(self._fieldnames)) == self._n_fields:
+            self.__row_class = row_class(self._fieldnames)
+        return self.__row_class
+
+    def read_objects(self) -> List[object]:
+        """ Read the whole file and return a list of Python objects with each one of the file rows.
+
+        :return: A list of objects that represents the list of file rows. See read_object() method for further
+        information.
+        """
+        return list(map(self.__row_factory(ReadMode.OBJECT), self.__iter_rows))
+
+    def read_batch(self, size: int) -> List[Any]:
+        """ Read the next rows of the file at once, converting directly the row values depending on the reader mode.
+
+        :param size: The maximum number of rows to read.
+        :return: A list with the read rows. It could have less rows than size if the end of the file is reached, or
+        be empty if there are not more rows.
+        """
+        return list(map(self.__row_factory(self.mode), islice(self.__iter_rows, size)))
+
+    def __row_factory(self, mode: ReadMode) -> Callable[[Sequence], Any]:
+        """ Get the function to convert the row values in an object, a dictionary or a list.
+
+        :param mode: The mode which the rows are converted.
+        :return: A function that receives the sequence of values of a row and returns the converted row.
+        """
+        fieldnames = self._fieldnames
+        if mode == ReadMode.OBJECT:
+            return self.__row_class._make if self.__get_row_class() else \
+                lambda values: dict2obj(dict(zip(fieldnames, values)))
+        if mode == ReadMode.DICT:
+            return lambda values: dict(zip(fieldnames, values))
+        return tuple if mode == ReadMode.TUPLE else list
+
+
+class _XlsxReader(_RowValuesReader):
+    """ The reader for Excel files in xlsx format, using openpyxl module. """
+    def _open(self, fname: str, sheet: Union[str, int]) -> None:
+        """ Open the workbook in read-only mode, select the sheet and read its fieldnames.
+
+        :param fname: The file path to the xlsx file.
+        :param sheet: The sheet to read.
+        """
+        self.__doc = open_xlsx(fname, read_only=True)
+        self._sheet = self.__doc[sheet] if isinstance(sheet, str) else self.__doc[self.__doc.sheetnames[sheet]]
+        # The sheet dimensions stored in the file could be wrong, so the rows are read until the end of the sheet
+        self.sheet.reset_dimensions()
+        self._fieldnames = tuple(self.remove_empty_cells(list(next(self.sheet.iter_rows(values_only=True)))))
+        # The rows are limited to the number of fieldnames, filling the missing cells with None
+        self._set_rows(self.sheet.iter_rows(min_row=2, max_col=len(self._fieldnames), values_only=True))
 
     def close(self) -> None:
-        """ Nothing to do. """
-        pass
+        """ Close the workbook opened in read-only mode. """
+        self.__doc.close()
 
-    def __read_xlsx_row(self, sheet) -> dict:
-        """ Write a row using openpyxl module.
-        :param sheet: The sheet to write the row.
-        :return: A dict with the fieldnames as keys.
+    def __len__(self) -> int:
         """
-        # return {self.fieldnames[i]: sheet.cell(row=self.__row, column=i + 1).value for i in range(len(self._fieldnames))}
-        row = next(self.__iter_rows)
-        # return {self.fieldnames[i]: cell.value for i, cell in enumerate(row)}
-        # row = next(self.sheet.rows)
-        return {self.fieldnames[i]: value for i, value in enumerate(row) if i < len(self._fieldnames)}
+        :return: The number of rows.
+        """
+        if self.sheet.max_row is None:
+            # The stored sheet dimensions are not used because they could be wrong, so the sheet is scanned once
+            self.sheet.calculate_dimension(force=True)
+        return self.sheet.max_row - 1
+
+
+class _CalamineReader(_RowValuesReader):
+    """ The reader for Excel files using python-calamine module. The values are returned with their Python types,
+    for example, the integer numbers as int, the booleans as bool and the dates as date or datetime.
+    """
+    def _open(self, fname: str, sheet: Union[str, int]) -> None:
+        """ Open the workbook, read the whole sheet and its fieldnames.
 
-    def __read_xls_row(self, sheet) -> dict:
-        """ Write a row using xlrd module.
-        :param sheet: The sheet to write the row.
-        :return: A dict with the fieldnames as keys.
+        :param fname: The file path to the Excel file.
+        :param sheet: The sheet to read.
         """
-        return {self.fieldnames[i]: cell.value for i, cell in enumerate(sheet.row(self.__row - 1))}
+        self.__doc = open_calamine(fname)
+        self._sheet = self.__doc.get_sheet_by_name(sheet) if isinstance(sheet, str) else \
+            self.__doc.get_sheet_by_index(sheet)
+        # The empty rows and columns at the beginning are kept, so the head is always the first row of the sheet
+        self.__rows = self._sheet.to_python(skip_empty_area=False)
+        rows = iter(self.__rows)
+        self._fieldnames = tuple(next(rows, ()))
+        self._set_rows(rows)
+
+    def close(self) -> None:
+        """ Close the workbook. """
+        self.__doc.close()
 
     def __len__(self) -> int:
         """
         :return: The number of rows.
         """
-        return (self.sheet.max_row if self.__type == 'xlsx' else self.sheet.nrows) - 1
+        return len(self.__rows) - 1
+
+
+class _XlsReader(_RowValuesReader):
+    """ The reader for Excel files in the old xls format, using xlrd module. """
+    def _open(self, fname: str, sheet: Union[str, int]) -> None:
+        """ Open the workbook loading only the selected sheet and read its fieldnames.
+
+        :param fname: The file path to the xls file.
+        :param sheet: The sheet to read.
+        """
+        self.__doc = open_xls(fname, on_demand=True)
+        self._sheet = self.__doc.sheet_by_name(sheet) if isinstance(sheet, str) else self.__doc.sheet_by_index(sheet)
+        self._fieldnames = tuple(self._sheet.row_values(0))
+        # The cell values are taken directly from the loaded sheet, without creating a Cell object for each one
+        self._set_rows(map(self.__row_values, range(1, self._sheet.nrows)))
+
+    def __row_values(self, row: int) -> list:
+        """ Get the values of a sheet row. The xlrd module reads all the numbers as float, therefore, the number
+        cells with integral values are converted to int, as the other Excel readers do.
+
+        :param row: The row index.
+        :return: The list of row values.
+        """
+        return [int(value) if cell_type == _XL_CELL_NUMBER and value.is_integer() else value
+                for value, cell_type in zip(self._sheet.row_values(row), self._sheet.row_types(row))]
+
+    def close(self) -> None:
+        """ Close the workbook releasing its resources. """
+        self.__doc.release_resources()
+
+    def __len__(self) -> int:
+        """
+        :return: The number of rows.
+        """
+        return self.sheet.nrows - 1
 
 
 class ExcelWriter(ExcelData, DataWriter):
-    """ The class to create an Excel file easily """
+    """ The class to create an Excel file easily. When it is created, it returns the writer for the file format. """
+    def __new__(cls, fname: str, *args, **kwargs) -> 'ExcelWriter':
+        """ Select the writer class depending on the file extension.
+
+        :param fname: The file path to the Excel file.
+        :return: A writer for xls files if fname ends in .xls, or for xlsx files if ends in .xlsx. If cls is a subclass
+          of ExcelWriter, the writer is also an instance of that subclass.
+        :raises ValueError: If the file name does not end in .xls or .xlsx.
+        """
+        if not issubclass(cls, (_XlsxWriter, _XlsWriter)):
+            ext = _excel_format(fname)
+            if ext == 'xlsx':
+                format_class = _XlsxWriter
+            elif ext == 'xls':
+                format_class = _XlsWriter
+            else:
+                raise ValueError('The file name has to be the xlsx or xls extensions.')
+            cls = format_class if cls is ExcelWriter else _format_class(cls, format_class)
+        return super(ExcelWriter, cls).__new__(cls)
+
     def __init__(self, fname: str, sheet: Union[str, int] = 0, fieldnames: Union[List[str], type, object] = None,
                  mode: Mode = Mode.WRITE):
         """ Constructor.
@@ -222,45 +518,204 @@ class ExcelWriter(ExcelData, DataWriter):
         attributes.
         :param mode: The writing mode: Mode.APPEND or Mode.WRITE. By default Mode.WRITE.
         """
-        DataWriter.__init__(self, fname, mode)
-        ExcelData.__init__(self, fname, sheet=sheet)
-        self.__num_row = 0
+        super(ExcelWriter, self).__init__(fname, sheet=sheet, mode=mode)
+        self._num_row = 0
         if mode == Mode.WRITE:
-            if not fieldnames:
+            if fieldnames:
+                self._fieldnames = self._parse_fieldnames(fieldnames)
+            # The subclasses could define the fieldnames overriding the fieldnames property
+            if not self.fieldnames:
                 raise ValueError('The fieldnames parameters must contain a least a field name in write mode.')
-            self._fieldnames = self._parse_fieldnames(fieldnames)
-            self._doc, self._sheet, self.__type = create_excel(fname, sheet)
+            self.__create_sheet(fname, sheet)
             self.write_list(self.fieldnames)
         elif mode == Mode.APPEND:
             with ExcelReader(fname, sheet, ReadMode.DICT) as reader:
                 self._fieldnames = self._parse_fieldnames(fieldnames) if fieldnames else reader.fieldnames
-                self._doc, self._sheet, self.__type = create_excel(fname, sheet)
+                self.__create_sheet(fname, sheet)
                 self.write_list(self.fieldnames)
                 self.import_reader(reader)
 
+    def __create_sheet(self, fname: str, sheet: Union[str, int]) -> None:
+        """ Create the Excel document and prepare the fieldnames to write the rows.
+
+        :param fname: The file path to the Excel file.
+        :param sheet: The sheet to write.
+        """
+        # The workbook is saved in a temporal file in the same directory, which replaces the final one when the writer
+        # is closed. Its name is unique, so several writers can write the same file at the same time.
+        fd, self._tmp_fname = mkstemp(suffix=os.path.splitext(fname)[1], dir=os.path.dirname(fname) or '.')
+        os.close(fd)
+        self._doc, self._sheet, _ = create_excel(self._tmp_fname, sheet, constant_memory=True)
+        self._enum_fields = list(enumerate(self.fieldnames))
+        self._field_order = fields = tuple(self.fieldnames)
+        self._n_fields = len(self._enum_fields)
+        # Get the values of a dictionary with all the fieldnames in only one call, it raises KeyError if any is missing
+        self._get_values = itemgetter(*fields) if len(fields) > 1 else lambda row: tuple(row[f] for f in fields)
+
     def write_row(self, **row) -> None:
         """ Append a row to the sheet.
 
         :param row: The row to append.
         """
-        sheet_row = self.sheet.row(self.__num_row) if self.__type == 'xls' else self.sheet
-        for i, field in enumerate(self.fieldnames):
-            if field in row:
-                if self.__type == 'xls':
-                    sheet_row.write(i, row[field])
-                else:
-                    sheet_row.write(self.__num_row, i, row[field])
-        self.__num_row += 1
+        self.write_dict(row)
+
+    @abstractmethod
+    def write_dict(self, row: dict) -> None:
+        """ Append a dictionary as a row to the sheet.
+
+        :param row: A dictionary with the fieldnames as a key and the row data as the dictionary values.
+        """
+        pass
 
     def close(self) -> None:
-        """ Close saving the file. """
-        if self.__type == 'xls':
-            self._doc.save(self.file_name)
+        """ Close saving the file. The workbook is saved in a temporal file that replaces the final file at once,
+        therefore, the final file is never partially written. If the writer is already closed, nothing is done.
+        """
+        if self._tmp_fname is None:
+            return
+        try:
+            self._save()
+        except BaseException:
+            if os.path.exists(self._tmp_fname):
+                os.remove(self._tmp_fname)
+            raise
+        finally:
+            tmp_fname, self._tmp_fname = self._tmp_fname, None
+        # The temporal files are only readable by their owner, so they take the permissions of a new file
+        os.chmod(tmp_fname, _file_mode(self.file_name))
+        os.replace(tmp_fname, self.file_name)
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """ Close the writer saving the file. If the with block has raised an exception, the partially written
+        workbook is discarded and the final file is not modified.
+        """
+        if exc_type is None:
+            self.close()
         else:
-            self._doc.close()
+            self.__discard()
+
+    def __discard(self) -> None:
+        """ Close the writer removing the temporal file without replacing the final file. """
+        if self._tmp_fname is None:
+            return
+        tmp_fname, self._tmp_fname = self._tmp_fname, None
+        try:
+            self._release()
+        except Exception:
+            # The exception raised in the with block is the relevant one
+            pass
+        if os.path.exists(tmp_fname):
+            os.remove(tmp_fname)
+
+    @abstractmethod
+    def _save(self) -> None:
+        """ Save the workbook in the temporal file. """
+        pass
+
+    def _release(self) -> None:
+        """ Release the resources of a workbook that is not going to be saved. By default, nothing is done. """
+        pass
 
     def __len__(self) -> int:
         """
         :return: The number of rows.
         """
-        return self.__num_row - 1
+        return self._num_row - 1
+
+
+class _XlsxWriter(ExcelWriter):
+    """ The writer for Excel files in xlsx format, using xlsxwriter module. """
+    def write_dict(self, row: dict) -> None:
+        """ Append a dictionary as a row to the sheet.
+
+        :param row: A dictionary with the fieldnames as a key and the row data as the dictionary values.
+        """
+        try:
+            values = self._get_values(row)
+        except KeyError:
+            # The missing fields are written as None, which xlsxwriter ignores as blank cells without format
+            values = list(map(row.get, self._field_order))
+        self._sheet.write_row(self._num_row, 0, values)
+        self._num_row += 1
+
+    def write_dicts(self, rows: Sequence[dict]) -> None:
+        """ Write a list of dictionaries, writing each one with only one call to xlsxwriter.
+
+        :param rows:  The list of dictionaries. Each dictionary has to contain as keys the fieldnames and as value
+        the row data to store.
+        """
+        write_row, get_values, fields = self._sheet.write_row, self._get_values, self._field_order
+        num_row = self._num_row
+        for row in rows:
+            try:
+                values = get_values(row)
+            except KeyError:
+                values = list(map(row.get, fields))
+            write_row(num_row, 0, values)
+            num_row += 1
+        self._num_row = num_row
+
+    def _write_values(self, values: Sequence) -> None:
+        """ Write a row from its values directly in the sheet cells, without converting them into a dictionary.
+
+        :param values: The row values in the same order than the fieldnames. The extra values are ignored.
+        """
+        self._sheet.write_row(self._num_row, 0, values if len(values) <= self._n_fields else values[:self._n_fields])
+        self._num_row += 1
+
+    def write_lists(self, lists: Sequence[list]) -> None:
+        """ Write a sequences of lists as a sequence of rows, writing each one with only one call to xlsxwriter.
+
+        :param lists: The sequence of rows as lists.
+        """
+        write_row, num_row, n_fields = self._sheet.write_row, self._num_row, self._n_fields
+        for lst in lists:
+            # The rows that fit in the fieldnames are written directly, without copying them
+            write_row(num_row, 0, lst if len(lst) <= n_fields else lst[:n_fields])
+            num_row += 1
+        self._num_row = num_row
+
+    def _save(self) -> None:
+        """ Save the workbook in the temporal file. """
+        self._doc.close()
+
+    def _release(self) -> None:
+        """ Release the temporal files that xlsxwriter uses in constant memory mode, which are only removed when the
+        workbook is closed.
+        """
+        self._doc.close()
+
+
+class _XlsWriter(ExcelWriter):
+    """ The writer for Excel files in the old xls format, using xlwt module. """
+    def write_dict(self, row: dict) -> None:
+        """ Append a dictionary as a row to the sheet.
+
+        :param row: A dictionary with the fieldnames as a key and the row data as the dictionary values.
+        """
+        write = self._sheet.row(self._num_row).write
+        try:
+            for i, value in enumerate(self._get_values(row)):
+                write(i, value)
+        except KeyError:
+            # Only the fields in the dictionary are written
+            get = row.get
+            for i, field in self._enum_fields:
+                value = get(field, _MISSING)
+                if value is not _MISSING:
+                    write(i, value)
+        self._num_row += 1
+
+    def _write_values(self, values: Sequence) -> None:
+        """ Write a row from its values directly in the sheet cells, without converting them into a dictionary.
+
+        :param values: The row values in the same order than the fieldnames. The extra values are ignored.
+        """
+        sheet_row = self._sheet.row(self._num_row)
+        for i, value in enumerate(values[:self._n_fields]):
+            sheet_row.write(i, value)
+        self._num_row += 1
+
+    def _save(self) -> None:
+        """ Save the workbook in the temporal file. """
+        self._doc.save(self._tmp_fname)
@@ -1,6 +1,15 @@
 from collections import namedtuple
+from functools import lru_cache
 from inspect import getmembers, isroutine
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+from weakref import WeakKeyDictionary
+
+# The public attribute names defined in each class, like properties or class attributes.
+_CLASS_ATTRIBUTE_NAMES = WeakKeyDictionary()
+# The public attribute names of the objects of each class, for each tuple of their public instance attribute names.
+_ATTRIBUTE_NAMES = WeakKeyDictionary()
+# The value returned when an object does not have an attribute
+_MISSING = object()
 
 
 def to_identifier(s: str) -> str:
@@ -16,8 +25,47 @@ def attributes2dict(obj: object) -> Dict[str, Any]:
     :param obj: The object to extract its attributes.
     :return: A dictionary with the name of the attribute and its value.
     """
-    members = getmembers(obj, lambda member: not (isroutine(member)))
-    return {att[0]: att[1] for att in members if not att[0].startswith('_')}
+    d = {}
+    for name in _attribute_names(obj):
+        value = getattr(obj, name, _MISSING)
+        if value is not _MISSING:
+            d[name] = value
+    return d
+
+
+def _class_attribute_names(cls: type) -> Tuple[str, ...]:
+    """ Get the public attribute names defined in a class, like properties or class attributes, but not methods.
+    They are calculated only once for each class.
+    :param cls: The class to extract its attribute names.
+    :return: A tuple with the name of the attributes, sorted alphabetically.
+    """
+    names = _CLASS_ATTRIBUTE_NAMES.get(cls)
+    if names is None:
+        members = getmembers(cls, lambda member: not (isroutine(member)))
+        names = tuple(att[0] for att in members if not att[0].startswith('_'))
+        _CLASS_ATTRIBUTE_NAMES[cls] = names
+    return names
+
+
+def _attribute_names(obj: object) -> Tuple[str, ...]:
+    """ Get the public attribute names of an object. The names defined in its class are cached, but the instance
+    attributes are taken from each object because the objects of the same class could have different attributes.
+    If the object is a class, only the names defined in that class are returned.
+    :param obj: The object to extract its attribute names.
+    :return: A tuple with the name of the attributes, sorted alphabetically.
+    """
+    if isinstance(obj, type):
+        return _class_attribute_names(obj)
+    cls = type(obj)
+    instance_names = tuple(name for name, value in getattr(obj, '__dict__', {}).items()
+                           if not name.startswith('_') and not isroutine(value))
+    cache = _ATTRIBUTE_NAMES.get(cls)
+    if cache is None:
+        cache = _ATTRIBUTE_NAMES[cls] = {}
+    names = cache.get(instance_names)
+    if names is None:
+        names = cache[instance_names] = tuple(sorted(set(_class_attribute_names(cls)).union(instance_names)))
+    return names
 
 
 def attributes2list(obj: object) -> List[str]:
@@ -26,8 +74,7 @@ def attributes2list(obj: object) -> List[str]:
     :param obj: The object to extract its attributes.
     :return: A list with the name of attributes.
     """
-    members = getmembers(obj, lambda member: not (isroutine(member)))
-    return [att[0] for att in members if not att[0].startswith('_')]
+    return list(_attribute_names(obj))
 
 
 def dict2obj(d: dict) -> object:
@@ -38,8 +85,17 @@ def dict2obj(d: dict) -> object:
     to convert it to an valid identifier replacing the incorrect characters by a _, or adding a _ at the start if
     the identifier starts with a number.
     """
-    keys = [to_identifier(key) for key in d.keys()]
-    return namedtuple('Row', keys)(*d.values()) if d else None
+    return row_class(tuple(d))(*d.values()) if d else None
+
+
+@lru_cache(maxsize=128)
+def row_class(fieldnames: Tuple[str, ...]) -> type:
+    """ Create the class of the row objects for a sequence of fieldnames. The class is only created once for the
+    same fieldnames because to create a namedtuple class is very expensive.
+    :param fieldnames: The fieldnames.
+    :return: A namedtuple class named "Row" with the fieldnames converted into valid identifiers as attributes.
+    """
+    return namedtuple('Row', [to_identifier(field) for field in fieldnames])
 
 
 def dict2list(d: dict) -> List[Any]:
@@ -47,12 +103,12 @@ def dict2list(d: dict) -> List[Any]:
     :param d: The dictionary.
     :return: A list with the values of that dictionary.
     """
-    return [v for v in d.values()]
+    return list(d.values())
 
 
 def dict_keys2list(d: dict) -> List[Any]:
-    """ Convert the values or a dictionary into a list.
+    """ Convert the keys or a dictionary into a list.
     :param d: The dictionary.
-    :return: A list with the values of that dictionary.
+    :return: A list with the keys of that dictionary.
     """
-    return [v for v in d.keys()]
+    return list(d)
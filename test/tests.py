@@ -5,20 +5,26 @@ To execute this, it is recommended to install the requirement file:
 pip install -r requirements.txt
 """
 import os
+import subprocess
+import sys
 import unittest
+import zipfile
 from random import randint
 from time import perf_counter
 from typing import List
+from unittest.mock import patch
 
 from mysutils.tmp import removable_files
 from tqdm import tqdm
 
 from filedatasource import CsvWriter, CsvReader, ExcelWriter, ExcelReader, Mode, ReadMode, DataWriter, DataReader, \
     open_reader, open_writer, excel2list, excel2dict, csv2dict, csv2objects, objects2csv, dict2csv, list2csv, csv2list, \
-    save, load, convert, load_lists, sheets, objects2excel
+    save, load, convert, load_lists, sheets, objects2excel, csv2list_iter, excel2list_iter
 from filedatasource.builder import equals, save_objs, load_dicts, load_objs, save_dicts, save_lists
 from filedatasource.csvfile import open_file
-from filedatasource.datafile import DataSourceError
+from filedatasource.datafile import DataSourceError, DataFile
+from filedatasource.excel import calamine_module, ExcelData
+from filedatasource.utils import dict2obj, attributes2dict
 
 DATA_FILE = 'data.csv'
 COMPRESSED_FILE = 'data.csv.gz'
@@ -59,6 +65,13 @@ class Example(object):
         self.a, self.b, self.c = a, b, c
 
 
+class OptionalAttributes(object):
+    def __init__(self, a: int, b: bool = None):
+        self.a = a
+        if b is not None:
+            self.b = b
+
+
 lists = [
     [1, 2, 3],
     [4, 5, 6],
@@ -96,11 +109,19 @@ class TestWriter(CsvWriter):
         return ['a', 'b', 'c']
 
 
+class TestExcelWriter(ExcelWriter):
+    @property
+    def fieldnames(self) -> List[str]:
+        return ['a', 'b', 'c']
+
+
+class TestExcelReader(ExcelReader):
+    def read_list(self) -> list:
+        return [value * 2 for value in super().read_list()]
+
+
 def list_to_int(lists: List[List[str]]) -> List[List[int]]:
-    r = []
-    for lst in lists:
-        r.append([int(x) for x in lst])
-    return r
+    return [list(map(int, lst)) for lst in lists]
 
 
 class MyTestCase(unittest.TestCase):
@@ -254,6 +275,8 @@ class MyTestCase(unittest.TestCase):
         writer.write_objects(objects)
 
     def test_read_modes(self) -> None:
+        with CsvWriter(DATA_FILE, fieldnames=('a', 'b', 'c')) as writer:
+            self.assertListEqual(writer.fieldnames, ['a', 'b', 'c'])
         with CsvWriter(DATA_FILE, fieldnames=['a', 'b', 'c']) as writer:
             self.__write_lists_writer(writer)
         with CsvReader(DATA_FILE, mode=ReadMode.DICT) as reader:
@@ -264,6 +287,14 @@ class MyTestCase(unittest.TestCase):
             for obj in reader:
                 pass
         self.assertListEqual(obj, ['22', '23', '24'])
+        with CsvReader(DATA_FILE, mode=ReadMode.TUPLE) as reader:
+            for obj in reader:
+                pass
+        self.assertTupleEqual(obj, ('22', '23', '24'))
+        convert(DATA_FILE, EXCEL_FILE)
+        with ExcelReader(EXCEL_FILE, mode=ReadMode.TUPLE) as reader:
+            self.assertListEqual(list(reader)[-2:], [('19', '20', '21'), ('22', '23', '24')])
+        os.remove(EXCEL_FILE)
         with CsvReader(DATA_FILE, mode=ReadMode.OBJECT) as reader:
             for obj in reader:
                 pass
@@ -280,21 +311,65 @@ class MyTestCase(unittest.TestCase):
             self.assertEqual(len(writer), 3)
             writer.write_dicts(dicts)
             self.assertEqual(len(writer), 5)
+            writer.write_lists(iter(lists))
+            self.assertEqual(len(writer), 8)
+            writer.write_dicts(row for row in dicts)
+            self.assertEqual(len(writer), 10)
         with CsvReader(COMPRESSED_FILE, mode=ReadMode.OBJECT) as reader:
             self.assertListEqual(reader.read_list(), ['1', '2', '3'])
-            self.assertEqual(len(reader), 5)
+            self.assertEqual(len(reader), 10)
             for obj in reader:
                 pass
         self.assertEqual(obj.b, '14')
         self.assertEqual(obj.c, '15')
+        os.remove(COMPRESSED_FILE)
+        with CsvWriter(DATA_FILE, fieldnames=['a', 'b', 'c'], mode=Mode.APPEND) as writer:
+            self.assertEqual(len(writer), 0)
+            writer.write_lists(lists)
+        self.assertListEqual(csv2list(DATA_FILE), [[str(value) for value in lst] for lst in lists])
+        os.remove(DATA_FILE)
+
+    @staticmethod
+    def umask() -> int:
+        umask = os.umask(0)
+        os.umask(umask)
+        return umask
 
     def test_xls_xlsx(self) -> None:
+        files = set(os.listdir('.'))
+        with ExcelWriter(EXCEL_FILE, fieldnames=['a', 'b', 'c']) as writer, \
+                ExcelWriter(EXCEL_FILE, fieldnames=['a', 'b', 'c']) as writer2:
+            self.__write_lists_writer(writer)
+            self.assertFalse(os.path.exists(EXCEL_FILE))
+            writer.close()
+            self.assertEqual(os.stat(EXCEL_FILE).st_mode & 0o777, 0o666 & ~self.umask())
+            writer2.write_lists(lists)
+        self.assertSetEqual(set(os.listdir('.')), files | {EXCEL_FILE})
+        with ExcelReader(EXCEL_FILE, mode=ReadMode.LIST) as reader:
+            self.assertListEqual(reader.read_lists(), lists)
         with ExcelWriter(EXCEL_FILE, fieldnames=['a', 'b', 'c']) as writer:
             self.__write_lists_writer(writer)
+        with ExcelReader(EXCEL_FILE) as reader:
+            self.check_lists_reader(reader)
+        with self.assertRaises(ValueError):
+            with ExcelWriter(EXCEL_FILE, fieldnames=['a', 'b', 'c']) as writer:
+                writer.write_lists(lists)
+                raise ValueError('The writing fails')
+        self.assertSetEqual(set(os.listdir('.')), files | {EXCEL_FILE})
+        with patch('filedatasource.excel._XlsWriter._save') as save, self.assertRaises(ValueError):
+            with ExcelWriter(XLS_FILE, fieldnames=['a', 'b', 'c']) as writer:
+                raise ValueError('The writing fails')
+        save.assert_not_called()
+        with patch('filedatasource.excel._XlsxWriter._release', side_effect=OSError), self.assertRaises(ValueError):
+            with ExcelWriter(EXCEL_FILE, fieldnames=['a', 'b', 'c']) as writer:
+                writer._doc.close()
+                raise ValueError('The writing fails')
+        self.assertSetEqual(set(os.listdir('.')), files | {EXCEL_FILE})
         with ExcelReader(EXCEL_FILE) as reader:
             self.check_lists_reader(reader)
         with ExcelWriter(XLS_FILE, fieldnames=['a', 'b', 'c']) as writer:
             self.__write_lists_writer(writer)
+            writer.close()
         with ExcelReader(XLS_FILE) as reader:
             self.check_lists_reader(reader)
         os.remove(EXCEL_FILE)
@@ -373,6 +448,9 @@ class MyTestCase(unittest.TestCase):
 
     def test_sheets(self) -> None:
         with ExcelReader('Example.xls', sheet=0) as reader:
+            self.assertIsInstance(reader, ExcelReader)
+            # The result must not depend on if python-calamine is installed
+            self.assertEqual(type(reader).__name__, '_XlsReader')
             self.check_clients_sheet(reader)
             self.assertEqual(len(reader), 2)
         with ExcelReader('Example.xls', sheet=1) as reader:
@@ -390,6 +468,17 @@ class MyTestCase(unittest.TestCase):
         with ExcelReader('Example.xlsx', sheet=1) as reader:
             self.check_suppliers_sheet(reader)
             self.assertEqual(len(reader), 3)
+            self.assertListEqual(reader.remove_empty_cells(['a', None, 'b', None, None]), ['a', None, 'b'])
+            self.assertListEqual(reader.remove_empty_cells([None, None]), [])
+        with ExcelReader('Example.xls', sheet='Suppliers', calamine=False) as reader:
+            self.check_suppliers_sheet(reader)
+        if calamine_module():
+            with ExcelReader('Example.xls', sheet='Suppliers', calamine=True) as reader:
+                self.check_suppliers_sheet(reader)
+                self.assertEqual(len(reader), 3)
+            with ExcelReader('Example.xlsx', sheet='Clients', calamine=True) as reader:
+                self.check_clients_sheet(reader)
+                self.assertEqual(len(reader), 2)
         with ExcelReader('Example.xlsx', sheet='Clients') as reader:
             self.check_clients_sheet(reader)
             self.assertEqual(len(reader), 2)
@@ -397,6 +486,43 @@ class MyTestCase(unittest.TestCase):
             self.check_suppliers_sheet(reader)
             self.assertEqual(len(reader), 3)
 
+    def test_different_attributes(self) -> None:
+        self.assertDictEqual(attributes2dict(OptionalAttributes(1, True)), {'a': 1, 'b': True})
+        self.assertDictEqual(attributes2dict(OptionalAttributes(2)), {'a': 2})
+        with removable_files(DATA_FILE):
+            save_objs(DATA_FILE, [OptionalAttributes(1, True), OptionalAttributes(2)])
+            self.assertListEqual(load_lists(DATA_FILE), [['1', 'True'], ['2', '']])
+
+    def test_excel_subclasses(self) -> None:
+        for file in [EXCEL_FILE, XLS_FILE]:
+            with removable_files(file):
+                with TestExcelWriter(file) as writer:
+                    self.assertIsInstance(writer, TestExcelWriter)
+                    writer.write_lists(lists)
+                with TestExcelWriter(file, mode=Mode.APPEND) as writer:
+                    writer.write_dicts(dicts)
+                    self.assertEqual(len(writer), 5)
+                with TestExcelReader(file, mode=ReadMode.LIST) as reader:
+                    self.assertIsInstance(reader, TestExcelReader)
+                    self.assertListEqual(reader.fieldnames, ['a', 'b', 'c'])
+                    self.assertListEqual(reader.read_list(), [2, 4, 6])
+
+    def test_wrong_dimensions(self) -> None:
+        with removable_files(EXCEL_FILE, 'wrong.xlsx'):
+            save_lists(EXCEL_FILE, [[i, i + 1, i + 2] for i in range(10)], ['a', 'b', 'c'])
+            for dimension in ['A1:C3', 'A1:A3']:
+                # Rewrite the sheet dimensions stored in the file with wrong values
+                with zipfile.ZipFile(EXCEL_FILE) as src, zipfile.ZipFile('wrong.xlsx', 'w') as dst:
+                    for item in src.infolist():
+                        data = src.read(item.filename)
+                        if item.filename == 'xl/worksheets/sheet1.xml':
+                            data = data.replace(b'A1:C11', dimension.encode())
+                        dst.writestr(item, data)
+                with ExcelReader('wrong.xlsx', mode=ReadMode.LIST) as reader:
+                    self.assertListEqual(reader.fieldnames, ['a', 'b', 'c'])
+                    self.assertEqual(len(reader), 10)
+                    self.assertListEqual(reader.read_lists(), [[i, i + 1, i + 2] for i in range(10)])
+
     def check_clients_sheet(self, reader: DataReader) -> None:
         row = next(reader)
         self.assertEqual(row.Name, 'John')
@@ -473,7 +599,14 @@ class MyTestCase(unittest.TestCase):
                     dict2 = next(reader2)
                     self.assertDictEqual(dict1, dict2)
                 self.assertEqual(len(reader1), len(reader2))
+        convert(COMPRESSED_FILE, DATA_FILE)
+        self.assertTrue(equals(COMPRESSED_FILE, DATA_FILE))
         os.remove(COMPRESSED_FILE)
+        convert(DATA_FILE, COMPRESSED_FILE)
+        self.assertTrue(equals(COMPRESSED_FILE, DATA_FILE))
+        os.remove(COMPRESSED_FILE)
+        os.remove(DATA_FILE)
+        os.remove(XLS_FILE)
 
     def test_excel_append(self) -> None:
         with ExcelWriter(XLS_FILE, fieldnames=['a', 'b', 'c']) as writer:
@@ -493,6 +626,8 @@ class MyTestCase(unittest.TestCase):
             self.assertListEqual(reader.read_list(), [19, 20, 21])
             self.assertListEqual(reader.read_list(), [22, 23, 24])
             self.assertEqual(len(reader), 8)
+        with ExcelReader(XLS_FILE, calamine=False) as reader:
+            self.assertListEqual([type(value) for value in reader.read_list()], [int, int, int])
         os.remove(XLS_FILE)
         with ExcelWriter(EXCEL_FILE, fieldnames=['a', 'b', 'c']) as writer:
             writer.write_dicts(dicts)
@@ -618,6 +753,11 @@ class MyTestCase(unittest.TestCase):
             self.assertTrue(equals(f1, f2))
             save_objs(f2, objects)
             self.assertFalse(equals(f1, f2))
+            save_objs(f2, employees[:2])
+            self.assertFalse(equals(f1, f2))
+            self.assertFalse(equals(f2, f1))
+            save_dicts(f2, [{'name': 'John', 'surname': 'Smith'}])
+            self.assertFalse(equals(f1, f2))
             save_objs(f3, employees)
             self.assertTrue(equals(f1, f3))
             save_objs(f3, objects)
@@ -647,6 +787,70 @@ class MyTestCase(unittest.TestCase):
                 print(f'Total time for read {file}: {perf_counter() - begin:.2f}s')
                 self.assertLess(perf_counter() - begin, 10)
 
+    def test_chunks(self) -> None:
+        with removable_files(DATA_FILE, EXCEL_FILE):
+            list2csv(DATA_FILE, lists + lists, ['a', 'b', 'c'])
+            with CsvReader(DATA_FILE, mode=ReadMode.DICT) as reader:
+                chunks = list(reader.read_chunks(4))
+            self.assertListEqual([len(chunk) for chunk in chunks], [4, 2])
+            self.assertDictEqual(chunks[1][1], {'a': '7', 'b': '8', 'c': '9'})
+            with CsvReader(DATA_FILE, mode=ReadMode.LIST) as reader:
+                self.assertListEqual(reader.read_batch(2), [['1', '2', '3'], ['4', '5', '6']])
+                self.assertEqual(len(reader.read_batch(10)), 4)
+                self.assertListEqual(reader.read_batch(10), [])
+            chunks = list(csv2list_iter(DATA_FILE, types=[int, int, int], chunk_size=3))
+            self.assertListEqual(chunks, [lists, lists])
+            convert(DATA_FILE, EXCEL_FILE)
+            chunks = list(excel2list_iter(EXCEL_FILE, chunk_size=5))
+            self.assertListEqual([len(chunk) for chunk in chunks], [5, 1])
+            self.assertListEqual(chunks[1][0], ['7', '8', '9'])
+            with ExcelReader(EXCEL_FILE, mode=ReadMode.OBJECT) as reader:
+                chunks = list(reader.read_chunks(4))
+            self.assertListEqual([len(chunk) for chunk in chunks], [4, 2])
+            self.assertEqual(chunks[1][1].c, '9')
+            with ExcelReader(EXCEL_FILE, mode=ReadMode.TUPLE) as reader:
+                reader.read_row()
+                self.assertListEqual(reader.read_batch(2), [('4', '5', '6'), ('7', '8', '9')])
+                self.assertEqual(len(reader.read_batch(10)), 3)
+                self.assertListEqual(reader.read_batch(10), [])
+            with ExcelReader(EXCEL_FILE) as reader:
+                self.assertEqual(reader.read_objects()[5].a, '7')
+            with ExcelWriter(EXCEL_FILE, fieldnames=['a', 'a', 'b']) as writer:
+                writer.write_lists(lists)
+            with ExcelReader(EXCEL_FILE) as reader:
+                self.assertEqual(reader.read_object(), dict2obj({'a': 2, 'b': 3}))
+                self.assertListEqual(reader.read_objects(), [dict2obj({'a': 5, 'b': 6}), dict2obj({'a': 8, 'b': 9})])
+            with ExcelWriter(EXCEL_FILE, fieldnames=['a', 'b', 'c']) as writer:
+                writer.write_lists([[1, 2, 3, 4], [5, 6], (7, 8, 9)])
+            with ExcelReader(EXCEL_FILE, mode=ReadMode.LIST) as reader:
+                self.assertListEqual(reader.read_lists(), [[1, 2, 3], [5, 6, None], [7, 8, 9]])
+
+    def test_init_chain(self) -> None:
+        self.assertLess(ExcelReader.__mro__.index(ExcelData), ExcelReader.__mro__.index(DataReader))
+        self.assertLess(ExcelReader.__mro__.index(DataReader), ExcelReader.__mro__.index(DataFile))
+        self.assertLess(CsvWriter.__mro__.index(DataWriter), CsvWriter.__mro__.index(DataFile))
+        with removable_files(DATA_FILE, EXCEL_FILE):
+            with patch.object(DataFile, '__init__', autospec=True, side_effect=DataFile.__init__) as init:
+                with CsvWriter(DATA_FILE, fieldnames=['a', 'b', 'c']) as writer:
+                    writer.write_lists(lists)
+                with CsvReader(DATA_FILE, mode=ReadMode.DICT) as reader:
+                    self.assertEqual(reader.mode, ReadMode.DICT)
+                    self.assertEqual(reader.file_name, DATA_FILE)
+                with ExcelWriter(EXCEL_FILE, sheet='Data', fieldnames=['a', 'b', 'c']) as writer:
+                    self.assertEqual(writer.mode, Mode.WRITE)
+                    self.assertEqual(writer.sheet_name, 'Data')
+                with ExcelReader(EXCEL_FILE, mode=ReadMode.LIST) as reader:
+                    self.assertEqual(reader.mode, ReadMode.LIST)
+                    self.assertEqual(reader.file_name, EXCEL_FILE)
+            self.assertEqual(init.call_count, 4)
+
+    def test_lazy_imports(self) -> None:
+        modules = subprocess.check_output([sys.executable, '-c',
+                                           'import sys, filedatasource; print(" ".join(sys.modules))'],
+                                          cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), text=True)
+        for module in ['gzip', 'isal', 'openpyxl', 'python_calamine', 'xlrd', 'xlsxwriter', 'xlwt']:
+            self.assertNotIn(module, modules.split())
+
 
 if __name__ == '__main__':
     unittest.main()